@@ -1,3 +1,5 @@
+import asyncio
+
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
@@ -8,6 +10,9 @@ server_params = StdioServerParameters(
     env=None,  # Optional environment variables
 )
 
+# Images to run through the server
+image_paths = ["demo.png", "example_image.png"]
+
 
 async def run():
     async with stdio_client(server_params) as (read, write):
@@ -24,8 +29,26 @@ async def run():
 
             print(tools)
 
+            # Issue every tool call before awaiting any of them; responses are matched to
+            # requests by id, so several can be in flight on one session
+            results = await asyncio.gather(*(
+                session.call_tool("rotate_image", arguments={"image_path": path, "direction": "clockwise"})
+                for path in image_paths
+            ))
 
-if __name__ == "__main__":
-    import asyncio
+            for path, result in zip(image_paths, results):
+                # A failed call returns the error as text content instead of an image
+                if result.isError:
+                    print(f"{path}: error: {result.content[0].text}")
+                else:
+                    print(f"{path}: {len(result.content[0].data)} base64 characters")
 
-    asyncio.run(run())
\ No newline at end of file
+
+if __name__ == "__main__":
+    try:
+        import uvloop
+    except ImportError:
+        # uvloop isn't available on Windows
+        asyncio.run(run())
+    else:
+        uvloop.run(run())
\ No newline at end of file
@@ -1,16 +1,87 @@
-from PIL import Image, ImageDraw, ImageFont
+import functools
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import PIL
+from PIL import Image, ImageDraw, ImageFont, PngImagePlugin
 
 image_width = 2048
 image_height = 2048
+output_path = "example_image.png"
+
+# Font sizes for the arrow and for the upside-down text
+arrow_font_size = 800
+text_font_size = 10
+
+# Font names to try, in order of preference
+regular_fonts = ["Arial", "DejaVuSans.ttf"]
+bold_fonts = ["Arial Bold", "arialbd.ttf", "Arial-Bold.ttf", "DejaVuSans-Bold.ttf",
+              "FreeSansBold.ttf", "LiberationSans-Bold.ttf", "NotoSans-Bold.ttf"]
+
+
+@functools.lru_cache(maxsize=32)
+def load_font(font_size, bold=False):
+    # Resolve the font once per (size, bold) so repeated draws don't re-probe the filesystem.
+    # Returns None if no bold font is installed, so the caller decides how to fall back
+    for font_name in bold_fonts if bold else regular_fonts:
+        try:
+            return ImageFont.truetype(font_name, font_size)
+        except IOError:
+            continue
+    
+    return None if bold else ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=8)
+def render_glyph(char, font_size):
+    # Rasterize the glyph once into a standalone mask that can be pasted on later calls
+    font = load_font(font_size)
+    text_bbox = font.getbbox(char)
+    glyph = Image.new("L", (text_bbox[2] - text_bbox[0], text_bbox[3] - text_bbox[1]), 0)
+    ImageDraw.Draw(glyph).text((-text_bbox[0], -text_bbox[1]), char, fill=255, font=font)
+    return glyph, text_bbox
+
+
+def config_hash():
+    # Hash this script's source, the Pillow version and the fonts that resolve on this machine,
+    # so any change to them invalidates the saved image
+    h = hashlib.blake2b(digest_size=8)
+    h.update(Path(__file__).read_bytes())
+    h.update(PIL.__version__.encode())
+    # The regular font stands in for the bold one when no bold font is installed
+    text_font = load_font(text_font_size, bold=True) or load_font(text_font_size)
+    for font in (load_font(arrow_font_size), text_font):
+        # Pillow's built-in default font has no file path; it is covered by the Pillow version
+        font_path = getattr(font, "path", None)
+        if isinstance(font_path, str):
+            h.update(font_path.encode())
+            h.update(str(os.stat(font_path).st_mtime_ns).encode())
+    return h.hexdigest()
 
 
-def generate_image():
+def is_up_to_date(cfg_hash):
+    # The hash is stored as a PNG text chunk in the saved image
+    try:
+        with Image.open(output_path) as existing:
+            return existing.info.get("config_hash") == cfg_hash
+    except (FileNotFoundError, Image.UnidentifiedImageError):
+        return False
+
+
+def generate_image(force=False):
+    cfg_hash = config_hash()
+    if not force and is_up_to_date(cfg_hash):
+        print(f"{output_path} is up to date, skipping")
+        return
+    
     # Create a new white image
     base_image = Image.new("RGB", (image_width, image_height), color="white")
     base_draw = ImageDraw.Draw(base_image)
     
     # Draw a large down arrow character on the left side
-    draw_arrow_character(base_draw)
+    draw_arrow_character(base_image)
     
     # Draw a hollow black box in the top right corner
     draw_hollow_box(base_draw)
@@ -24,38 +95,31 @@ def generate_image():
     # Combine the images
     final_image = Image.alpha_composite(base_image.convert("RGBA"), text_overlay)
     
-    # Save the final image
-    final_image.save("example_image.png")
-    print("Image saved as example_image.png")
+    # Save the final image, tagged with the config hash, via a temp file so a partial write never looks up to date
+    pnginfo = PngImagePlugin.PngInfo()
+    pnginfo.add_text("config_hash", cfg_hash)
+    tmp_path = output_path + ".tmp"
+    final_image.save(tmp_path, format="PNG", pnginfo=pnginfo)
+    os.replace(tmp_path, output_path)
+    print(f"Image saved as {output_path}")
 
 
-def draw_arrow_character(draw):
+def draw_arrow_character(image):
     # Use the down arrow Unicode character: ↓
     arrow_char = "↓"
     
-    # Set font size and position
-    font_size = 800
+    # Set position
     left_margin = 100
     
-    # Try to load a font, or use default if not available
-    try:
-        font = ImageFont.truetype("Arial", font_size)
-    except IOError:
-        try:
-            font = ImageFont.truetype("DejaVuSans.ttf", font_size)
-        except IOError:
-            font = ImageFont.load_default()
-    
-    # Calculate text size and position
-    text_bbox = draw.textbbox((0, 0), arrow_char, font=font)
-    text_width = text_bbox[2] - text_bbox[0]
+    # Get the pre-rasterized glyph and its bounding box
+    glyph, text_bbox = render_glyph(arrow_char, arrow_font_size)
     text_height = text_bbox[3] - text_bbox[1]
     
     x_position = left_margin
     y_position = (image_height - text_height) // 2
     
-    # Draw the arrow character
-    draw.text((x_position, y_position), arrow_char, fill="black", font=font)
+    # Paste the arrow glyph, using it as a mask over a solid black fill
+    image.paste("black", (x_position + text_bbox[0], y_position + text_bbox[1]), glyph)
 
 
 def draw_hollow_box(draw):
@@ -78,39 +142,20 @@ def draw_upside_down_text(image):
     box_size = 400
     top_left = (image_width - box_margin - box_size, box_margin)
     
-    # Create a separate image for just the text at a higher resolution
-    text_size = box_size * 6
+    # Create a separate image for just the text at 3x the box size. A one-pixel stroke there adds a
+    # third of a pixel of weight once downsampled, which a 10px glyph can't take at 1x
+    supersample = 3
+    text_size = box_size * supersample
     text_img = Image.new("RGBA", (text_size, text_size), (0, 0, 0, 0))
     text_draw = ImageDraw.Draw(text_img)
     
-    # Add text with good resolution
-    font_size = 60
-    
-    # Try to use a bold font with multiple fallback options
-    try:
-        # Try various bold fonts that might be available on the system
-        font_found = False
-        for font_name in ["Arial Bold", "arialbd.ttf", "Arial-Bold.ttf", "DejaVuSans-Bold.ttf", 
-                          "FreeSansBold.ttf", "LiberationSans-Bold.ttf", "NotoSans-Bold.ttf"]:
-            try:
-                font = ImageFont.truetype(font_name, font_size)
-                font_found = True
-                break
-            except IOError:
-                continue
-        
-        # If no bold font was found, use regular font but make it thicker
-        if not font_found:
-            print("No bold font found, using regular font with simulated boldness")
-            try:
-                font = ImageFont.truetype("Arial", font_size)
-            except IOError:
-                try:
-                    font = ImageFont.truetype("DejaVuSans.ttf", font_size)
-                except IOError:
-                    font = ImageFont.load_default()
-    except Exception as e:
-        raise Exception(f"No font found: {e}")
+    # Use a bold font with multiple fallback options
+    font = load_font(text_font_size * supersample, bold=True)
+    if font is None:
+        # If no bold font was found, fall back to a regular font
+        print("No bold font found, using regular font")
+        font = load_font(text_font_size * supersample)
+    stroke_width = 1
     
     # Text lines
     lines = [
@@ -122,35 +167,28 @@ def draw_upside_down_text(image):
     ]
     
     # Set line spacing
-    line_height = font_size + 16
+    line_height = (text_font_size + 3) * supersample
     total_height = len(lines) * line_height
     
     # Calculate starting position to center text
     start_y = (text_size - total_height) // 2
     
+    # Measure every line once up front and center it horizontally
+    text_bboxes = [text_draw.textbbox((0, 0), line, font=font, stroke_width=stroke_width) for line in lines]
+    x_positions = [(text_size - (text_bbox[2] - text_bbox[0])) // 2 for text_bbox in text_bboxes]
+    
     # Draw each line
     for i, line in enumerate(lines):
-        # Get text dimensions
-        text_bbox = text_draw.textbbox((0, 0), line, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        
-        # Center the text horizontally
-        x_position = (text_size - text_width) // 2
-        y_position = start_y + (i * line_height)
-        
-        # Draw the text multiple times with slight offsets for a bold effect
-        for offset in [(0, 0), (2, 0), (0, 2), (2, 2)]:
-            text_draw.text((x_position + offset[0], y_position + offset[1]), line, fill="black", font=font)
-    
-    # Rotate the text 180 degrees
-    rotated_text = text_img.rotate(180, resample=Image.BICUBIC)
-    
-    # Resize to the final box size
-    final_text = rotated_text.resize((box_size, box_size), Image.LANCZOS)
+        text_draw.text((x_positions[i], start_y + i * line_height), line, fill="black", font=font,
+                       stroke_width=stroke_width, stroke_fill="black")
+    
+    # Rotate the text 180 degrees (an exact pixel permutation, no resampling needed), then
+    # box-downsample to the final size
+    rotated_text = text_img.transpose(Image.Transpose.ROTATE_180).reduce(supersample)
     
     # Paste the text onto the overlay image at the box position
-    image.paste(final_text, top_left, final_text)
+    image.paste(rotated_text, top_left, rotated_text)
 
 
 if __name__ == "__main__":
-    generate_image()
+    generate_image(force="--force" in sys.argv[1:])
@@ -1,11 +1,30 @@
-import json
+import asyncio
+import functools
+import io
+import os
 import struct
+import sys
 
 from mcp.server.fastmcp import FastMCP, Image
 from PIL import Image as PILImage
 
 mcp = FastMCP("Echo")
 
+# Fixed-size metadata header: the image format name as 8 NUL-padded ASCII bytes
+IMAGE_HEADER = struct.Struct(">8s")
+
+# Modes PNG stores and decodes back unchanged, and the modes that are sent as TIFF instead so they are kept as-is
+PNG_MODES = {"1", "L", "LA", "I;16", "P", "RGB", "RGBA"}
+TIFF_MODES = {"CMYK", "F", "I", "I;16B", "LAB", "PA"}
+# 16-bit modes neither format writes, relabelled as the writable mode with the same byte layout
+SAME_LAYOUT_MODES = {"I;16L": "I;16", "I;16N": "I;16" if sys.byteorder == "little" else "I;16B"}
+# Premultiplied alpha is converted to straight alpha. Anything else (YCbCr, HSV, ...) is converted to RGB(A)
+CONVERTED_MODES = {"La": "LA", "RGBa": "RGBA"}
+
+# MIME types for formats PIL.Image.MIME doesn't map to a standard one. MPO files start with a baseline JPEG,
+# which is what clients decode
+MIME_TYPES = {"MPO": "image/jpeg"}
+
 
 def pil_image_to_mcp_image(pil_img: PILImage.Image, format: str = "png") -> Image:
     """
@@ -13,31 +32,71 @@ def pil_image_to_mcp_image(pil_img: PILImage.Image, format: str = "png") -> Imag
     
     Args:
         pil_img: The PIL Image object
-        format: The format to use for the MCP Image (default: png)
+        format: The format to encode the image with (default: png). PNG falls back to TIFF for modes it can't store.
         
     Returns:
         An MCP Image object with embedded metadata. The format of the bytes is:
-        [4-byte metadata length][metadata JSON][image bytes]
+        [8-byte format name][encoded image bytes]
     """
-    width, height = pil_img.size
-    mode = pil_img.mode
-    image_bytes = pil_img.tobytes()
+    # Encode the image instead of shipping raw pixels; the encoded file is
+    # self-describing (size, mode, palette), so only the format goes in the header.
+    # compress_level=1 trades a little size for much faster encoding.
+    if format == "png" and pil_img.mode not in PNG_MODES:
+        if pil_img.mode in SAME_LAYOUT_MODES:
+            pil_img = PILImage.frombytes(SAME_LAYOUT_MODES[pil_img.mode], pil_img.size, pil_img.tobytes())
+        
+        if pil_img.mode in TIFF_MODES:
+            format = "tiff"
+        elif pil_img.mode in CONVERTED_MODES:
+            pil_img = pil_img.convert(CONVERTED_MODES[pil_img.mode])
+        elif pil_img.mode not in PNG_MODES:
+            pil_img = pil_img.convert("RGBA" if pil_img.has_transparency_data else "RGB")
+    buf = io.BytesIO()
+    pil_img.save(buf, format=format, compress_level=1)
+    # getbuffer() is a view of the encoded bytes, so they are only copied once, into the framed payload
+    image_bytes = buf.getbuffer()
+    
+    return encoded_image_to_mcp_image(image_bytes, format)
+
+
+def allocate_image_frame(format: str, image_size: int) -> tuple[bytearray, memoryview]:
+    """
+    Allocate the byte buffer for an MCP Image payload and write its metadata header.
     
-    # Create metadata dictionary
-    metadata = {
-        "width": width,
-        "height": height,
-        "mode": mode,
-        "format": pil_img.format or format,
-    }
+    Args:
+        format: The format the image bytes are encoded in
+        image_size: The number of encoded image bytes that will follow the header
+        
+    Returns:
+        The payload buffer, laid out as [8-byte format name][encoded image bytes], and a
+        writable memoryview of its image section for the caller to fill in place.
+    """
+    format_bytes = format.encode('ascii')
+    if len(format_bytes) > IMAGE_HEADER.size:
+        raise ValueError(f"Image format name must be at most {IMAGE_HEADER.size} characters: {format}")
     
-    # Convert metadata to JSON bytes
-    metadata_bytes = json.dumps(metadata).encode('utf-8')
+    combined_data = bytearray(IMAGE_HEADER.size + image_size)
+    IMAGE_HEADER.pack_into(combined_data, 0, format_bytes)
     
-    # Structure: [4-byte metadata length][metadata JSON][image bytes]
-    # Combine everything into a single byte stream
-    combined_data = struct.pack(">I", len(metadata_bytes)) + metadata_bytes + image_bytes
+    return combined_data, memoryview(combined_data)[IMAGE_HEADER.size:]
+
+
+def encoded_image_to_mcp_image(image_bytes: bytes | memoryview, format: str) -> Image:
+    """
+    Wrap already-encoded image bytes (e.g. the contents of a PNG file) in an MCP Image with embedded metadata.
     
+    Args:
+        image_bytes: The encoded image bytes
+        format: The format the image bytes are encoded in
+        
+    Returns:
+        An MCP Image object with embedded metadata. The format of the bytes is:
+        [8-byte format name][encoded image bytes]
+    """
+    # Write everything into a single preallocated buffer so the image bytes are copied once
+    combined_data, image_view = allocate_image_frame(format, len(image_bytes))
+    image_view[:] = image_bytes
+
     # Return the MCP Image object
     return Image(data=combined_data, format=format)
 
@@ -47,33 +106,42 @@ def mcp_image_to_pil_image(image_data: bytes) -> PILImage.Image:
     Convert MCP Image bytes back to a PIL Image.
     
     Args:
-        image_data: The MCP Image bytes with embedded metadata: [4-byte metadata length][metadata JSON][image bytes]
+        image_data: The MCP Image bytes with embedded metadata: [8-byte format name][encoded image bytes]
         
     Returns:
         A PIL Image reconstructed from the bytes
     """
-    # Extract metadata length (first 4 bytes)
-    metadata_length = struct.unpack(">I", image_data[:4])[0]
+    # Extract image bytes; PIL detects the format from the encoded bytes, so the header is skipped
+    image_bytes = image_data[IMAGE_HEADER.size:]
     
-    # Extract and parse metadata
-    metadata_bytes = image_data[4:4+metadata_length]
-    metadata = json.loads(metadata_bytes.decode('utf-8'))
+    # Decode the encoded image bytes into a PIL Image
+    img = PILImage.open(io.BytesIO(image_bytes))
+    img.load()
     
-    # Extract image bytes
-    image_bytes = image_data[4+metadata_length:]
+    return img
+
+
+def run_in_thread(fn):
+    """
+    Run a blocking tool function in a worker thread.
     
-    # Get image properties from metadata
-    width = metadata["width"]
-    height = metadata["height"]
-    mode = metadata["mode"]
+    File reads and PIL decode/encode would otherwise block the event loop that serves the stdio transport.
     
-    # Convert bytes to PIL Image
-    img = PILImage.frombytes(mode=mode, size=(width, height), data=image_bytes)
+    Args:
+        fn: The synchronous tool function
+        
+    Returns:
+        An async function with the same signature and docstring, which FastMCP registers as an async tool.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
     
-    return img
+    return wrapper
 
 
 @mcp.tool()
+@run_in_thread
 def echo_image(image_path: str) -> Image:
     """
     Echo an image as a tool.
@@ -84,14 +152,36 @@ def echo_image(image_path: str) -> Image:
     Returns:
         An MCP Image object containing the echoed image data.
     """
-    img = PILImage.open(image_path)
-    
-    mcp_image = pil_image_to_mcp_image(img)
+    # The file on disk is already an encoded image, so send its bytes as-is instead of decoding and re-encoding
+    with open(image_path, "rb") as f:
+        # Opening only parses the header (no pixel decode), which checks the file is an image and gives its real format
+        with PILImage.open(f) as img:
+            format = img.format.lower()
+            mime_type = MIME_TYPES.get(img.format, PILImage.MIME.get(img.format, ""))
+            if not mime_type.startswith("image/"):
+                # There is no image MIME type to label the file's bytes with, so send it re-encoded as PNG
+                return pil_image_to_mcp_image(img)
+        f.seek(0)
+        
+        # Read the file straight into the payload buffer rather than into an intermediate bytes object
+        image_size = os.fstat(f.fileno()).st_size
+        combined_data, image_view = allocate_image_frame(format, image_size)
+        if f.readinto(image_view) != image_size or f.read(1):
+            # st_size didn't match what could be read (e.g. it is 0 for some special files, or the file
+            # changed since fstat), so fall back to reading the whole file
+            f.seek(0)
+            image_bytes = f.read()
+            combined_data, image_view = allocate_image_frame(format, len(image_bytes))
+            image_view[:] = image_bytes
+    
+    # The header keeps PIL's format name, while the MIME type (image/<format>) uses the standard name
+    mcp_image = Image(data=combined_data, format=mime_type.removeprefix("image/"))
     
     return mcp_image
 
 
 @mcp.tool()
+@run_in_thread
 def rotate_image(image_path: str, direction: str) -> Image:
     """
     Rotate an image by 90 degrees.
@@ -103,10 +193,11 @@ def rotate_image(image_path: str, direction: str) -> Image:
         An MCP Image object containing the rotated image data.
     """
     img = PILImage.open(image_path)
+    # transpose is an exact pixel permutation, no resampling needed for 90 degree turns
     if direction == "clockwise":
-        img = img.rotate(-90, expand=True) 
+        img = img.transpose(PILImage.Transpose.ROTATE_270)
     elif direction == "counterclockwise":
-        img = img.rotate(90, expand=True)   
+        img = img.transpose(PILImage.Transpose.ROTATE_90)
     else:
         raise ValueError("Invalid direction")
     
@@ -116,6 +207,7 @@ def rotate_image(image_path: str, direction: str) -> Image:
 
 
 @mcp.tool()
+@run_in_thread
 def crop_and_zoom(image_path: str, x_min: float, y_min: float, x_max: float, y_max: float, zoom_factor: float = 1.0) -> Image:
     """
     Crop and zoom an image based on a normalized bounding box.
@@ -145,11 +237,8 @@ def crop_and_zoom(image_path: str, x_min: float, y_min: float, x_max: float, y_m
     right = min(int(x_max * width), width)
     bottom = min(int(y_max * height), height)
     
-    # Crop the image
-    cropped_img = img.crop((left, top, right, bottom))
-    
-    # Zoom in
-    resized_img = cropped_img.resize((int(cropped_img.width * zoom_factor), int(cropped_img.height * zoom_factor)), PILImage.Resampling.LANCZOS)
+    # Crop and zoom in a single resampling pass over just the crop box
+    resized_img = img.resize((int((right - left) * zoom_factor), int((bottom - top) * zoom_factor)), PILImage.Resampling.LANCZOS, box=(left, top, right, bottom))
     
     # Convert to MCP image and return
     mcp_image = pil_image_to_mcp_image(resized_img)
@@ -1,8 +1,67 @@
+import asyncio
 import sys
+from contextlib import AsyncExitStack
 from pathlib import Path
 
+import pytest
+import pytest_asyncio
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop isn't available on Windows
+    uvloop = None
+
 # Add the project root to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent)) 
 
 def pytest_configure(config):
     config.option.tbstyle = "native" 
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    # Run the async tests on uvloop where available, which moves the large stdio payloads faster than the default loop
+    if uvloop is None:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def mcp_session():
+    '''
+    Starts a single MCP server and session shared by every test, so the server startup and
+    initialize handshake happen once per test run instead of once per test
+    '''
+    # Server parameters for stdio connection
+    server_params = StdioServerParameters(
+        command="uv",
+        args=["run", "python", "image_server.py"],
+        env=None,
+    )
+    
+    # anyio requires stdio_client to be exited by the task that entered it, but pytest-asyncio
+    # runs fixture setup and teardown in different tasks, so one task owns the session until teardown
+    ready = asyncio.get_running_loop().create_future()
+    done = asyncio.Event()
+    
+    async def hold_session():
+        async with AsyncExitStack() as stack:
+            read, write = await stack.enter_async_context(stdio_client(server_params))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            ready.set_result(session)
+            await done.wait()
+    
+    task = asyncio.create_task(hold_session())
+    await asyncio.wait([ready, task], return_when=asyncio.FIRST_COMPLETED)
+    if not ready.done():
+        # The server failed to start, surface its error
+        task.result()
+    
+    yield ready.result()
+    
+    done.set()
+    await task
@@ -1,464 +1,281 @@
-import base64
-import re
-from contextlib import asynccontextmanager
+import asyncio
+import functools
+import io
+from pathlib import Path
 
-import numpy as np
+import pybase64
 import pytest
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
 from PIL import Image as PILImage
 
-from image_server import mcp_image_to_pil_image
+from image_server import IMAGE_HEADER, mcp_image_to_pil_image
+
+
+# Read and decoded once for the whole module rather than before every test. PIL decodes
+# lazily, so load() makes the decode happen here instead of inside whichever test touches
+# the pixels first (possibly from a worker thread)
+image_path = "demo.png"
+demo_bytes = Path(image_path).read_bytes()
+original_image = PILImage.open(io.BytesIO(demo_bytes), formats=["PNG"])
+original_image.load()
+
+
+def images_equal(a: PILImage.Image, b: PILImage.Image) -> bool:
+    '''
+    Pixel-exact comparison of two images. Comparing the raw bytes is a single memcmp and
+    avoids allocating numpy copies of both images
+    '''
+    return a.size == b.size and a.mode == b.mode and a.tobytes() == b.tobytes()
+
+
+@functools.lru_cache(maxsize=None)
+def local_crop_and_zoom(x_min: float, y_min: float, x_max: float, y_max: float, zoom_factor: float = 1.0) -> PILImage.Image:
+    '''
+    Reproduces crop_and_zoom locally with PIL using the same algorithm as the server. Inputs are
+    fixed per test case, so each reference image (LANCZOS for zoomed cases) is only computed once
+    '''
+    width, height = original_image.size
+    left = int(x_min * width)
+    top = int(y_min * height)
+    right = min(int(x_max * width), width)
+    bottom = min(int(y_max * height), height)
+    
+    return original_image.resize(
+        (int((right - left) * zoom_factor), 
+         int((bottom - top) * zoom_factor)),
+        PILImage.Resampling.LANCZOS,
+        box=(left, top, right, bottom)
+    )
 
 
 class TestImageServer:
-    def setup_method(self):
-        # Server parameters for stdio connection
-        self.server_params = StdioServerParameters(
-            command="uv",
-            args=["run", "python", "image_server.py"],
-            env=None,
-        )
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_list_tools(self, mcp_session):
+        '''
+        Verifies that the expected tools exist
+        '''
+        session = mcp_session
+        tools = await session.list_tools()
+        
+        expected_tools = ["echo_image", "rotate_image", "crop_and_zoom"]
         
-        self.image_path = "demo.png"
+        actual_tools = [tool.name for tool in tools.tools]
         
-        self.original_image = PILImage.open(self.image_path)
+        assert sorted(actual_tools) == sorted(expected_tools)
     
-    @asynccontextmanager
-    async def get_session(self): 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_echo_image(self, mcp_session):
         '''
-        Context manager of context managers that starts a session with the MCP server so we can try querying it
+        Verifies that the echo_image tool works. It should return the image file's bytes unchanged, which reconstruct the original PIL image
         '''
-        async with stdio_client(self.server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                yield session
+        
+        session = mcp_session
+        result = await session.call_tool("echo_image", arguments={"image_path": image_path})
+        assert len(result.content) == 1
+        image_bytes_str = result.content[0].data
+        
+        image_bytes = pybase64.b64decode(image_bytes_str, validate=True)
+        
+        # The header names the format and the server sends the file's encoded bytes as-is after it.
+        # Identical encoded bytes decode to identical pixels, so there is no need to decode them here
+        assert IMAGE_HEADER.unpack_from(image_bytes)[0].rstrip(b"\0") == b"png"
+        assert image_bytes[IMAGE_HEADER.size:] == demo_bytes, "Payload differs from the file on disk"
     
-    @pytest.mark.asyncio
-    async def test_list_tools(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_echo_jpeg_mime_type(self, mcp_session, tmp_path):
         '''
-        Verifies that the expected tools exist
+        Verifies that echo_image labels a JPEG with the standard MIME type and keeps PIL's format name in the header
         '''
-        async with self.get_session() as session:
-            tools = await session.list_tools()
-            
-            tools = str(tools)
-            
-            expected_tools = ["echo_image", "rotate_image", "crop_and_zoom"]
-            
-
-            actual_tools = re.findall(r"name='([^']*)'", tools)
-            
-            assert tools is not None
-            assert sorted(actual_tools) == sorted(expected_tools)
+        path = tmp_path / "demo.jpg"
+        original_image.reduce(4).save(path)
+        
+        session = mcp_session
+        result = await session.call_tool("echo_image", arguments={"image_path": str(path)})
+        assert len(result.content) == 1
+        assert result.content[0].mimeType == "image/jpeg"
+        
+        image_bytes = pybase64.b64decode(result.content[0].data, validate=True)
+        assert IMAGE_HEADER.unpack_from(image_bytes)[0].rstrip(b"\0") == b"jpeg"
+        assert image_bytes[IMAGE_HEADER.size:] == path.read_bytes()
     
-    @pytest.mark.asyncio
-    async def test_echo_image(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_echo_non_image(self, mcp_session, tmp_path):
         '''
-        Verifies that the echo_image tool works. It should return bytes that can be reconstructed into the original PIL image
+        Verifies that echo_image rejects files that aren't images instead of echoing their bytes
         '''
+        path = tmp_path / "notes.png"
+        path.write_text("not an image")
         
-        async with self.get_session() as session:
-            result = await session.call_tool("echo_image", arguments={"image_path": self.image_path})
-            assert len(result.content) == 1
-            image_bytes_str = result.content[0].data
-            
-            image_bytes = base64.b64decode(image_bytes_str)
-
-            mcp_image = mcp_image_to_pil_image(image_bytes)
-            
-            # Convert images to numpy arrays for pixel comparison
-            original_array = np.array(self.original_image)
-            echo_array = np.array(mcp_image)
-            
-            # Verify images have same dimensions
-            assert original_array.shape == echo_array.shape, "Images have different dimensions"
-            
-            # Verify all pixels are identical
-            assert np.array_equal(original_array, echo_array), "Images are not identical pixelwise"
+        session = mcp_session
+        result = await session.call_tool("echo_image", arguments={"image_path": str(path)})
+        
+        assert result.isError
+        assert "cannot identify image file" in result.content[0].text
     
-    @pytest.mark.asyncio
-    async def test_rotate_image(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_rotate_image(self, mcp_session):
         '''
         Verifies that the rotate_image tool works correctly by comparing server-rotated
         images with locally rotated images using PIL
         '''
-        async with self.get_session() as session:
-            # Test clockwise rotation
-            clockwise_result = await session.call_tool(
+        session = mcp_session
+        # Request both rotations at once; they are independent
+        clockwise_result, counterclockwise_result = await asyncio.gather(
+            session.call_tool(
                 "rotate_image", 
-                arguments={"image_path": self.image_path, "direction": "clockwise"}
-            )
-            assert len(clockwise_result.content) == 1
-            clockwise_bytes = base64.b64decode(clockwise_result.content[0].data)
-            server_clockwise_image = mcp_image_to_pil_image(clockwise_bytes)
-            
-            # Create the same rotation locally with PIL
-            local_clockwise_image = self.original_image.rotate(-90, expand=True)
-            
-            # Test counterclockwise rotation
-            counterclockwise_result = await session.call_tool(
+                arguments={"image_path": image_path, "direction": "clockwise"}
+            ),
+            session.call_tool(
                 "rotate_image", 
-                arguments={"image_path": self.image_path, "direction": "counterclockwise"}
-            )
-            assert len(counterclockwise_result.content) == 1
-            counterclockwise_bytes = base64.b64decode(counterclockwise_result.content[0].data)
-            server_counterclockwise_image = mcp_image_to_pil_image(counterclockwise_bytes)
-            
-            # Create the same rotation locally with PIL
-            local_counterclockwise_image = self.original_image.rotate(90, expand=True)
-            
-            # Convert images to numpy arrays for comparison
-            server_clockwise_array = np.array(server_clockwise_image)
-            local_clockwise_array = np.array(local_clockwise_image)
-            server_counterclockwise_array = np.array(server_counterclockwise_image)
-            local_counterclockwise_array = np.array(local_counterclockwise_image)
-            
-            # Verify dimensions match
-            assert server_clockwise_array.shape == local_clockwise_array.shape
-            assert server_counterclockwise_array.shape == local_counterclockwise_array.shape
-            
-            # Verify the server-rotated images match the locally-rotated images
-            assert np.array_equal(server_clockwise_array, local_clockwise_array), "Clockwise rotation doesn't match"
-            assert np.array_equal(server_counterclockwise_array, local_counterclockwise_array), "Counterclockwise rotation doesn't match"
-    
-    @pytest.mark.asyncio
-    async def test_basic_crop(self):
-        '''
-        Verifies that the crop_and_zoom tool works correctly for a basic crop operation
-        with default zoom factor (1.0) by comparing server-cropped image with locally
-        cropped image using PIL
-        '''
-        # Define crop coordinates (normalized 0-1)
-        x_min, y_min, x_max, y_max = 0.25, 0.25, 0.75, 0.75
+                arguments={"image_path": image_path, "direction": "counterclockwise"}
+            ),
+        )
         
-        async with self.get_session() as session:
-            # Call the crop_and_zoom tool with default zoom factor (1.0)
-            crop_result = await session.call_tool(
-                "crop_and_zoom",
-                arguments={
-                    "image_path": self.image_path,
-                    "x_min": x_min,
-                    "y_min": y_min,
-                    "x_max": x_max,
-                    "y_max": y_max
-                }
-            )
-            
-            # Process the result
-            assert len(crop_result.content) == 1
-            crop_bytes = base64.b64decode(crop_result.content[0].data)
-            server_cropped_image = mcp_image_to_pil_image(crop_bytes)
-            
-            # Create the same crop locally with PIL
-            width, height = self.original_image.size
-            left = int(x_min * width)
-            top = int(y_min * height)
-            right = int(x_max * width)
-            bottom = int(y_max * height)
-            local_cropped_image = self.original_image.crop((left, top, right, bottom))
-            
-            # Convert images to numpy arrays for comparison
-            server_crop_array = np.array(server_cropped_image)
-            local_crop_array = np.array(local_cropped_image)
-            
-            # Verify dimensions match
-            assert server_crop_array.shape == local_crop_array.shape, "Cropped image dimensions don't match"
-            
-            # Verify the server-cropped image matches the locally-cropped image
-            assert np.array_equal(server_crop_array, local_crop_array), "Cropped image content doesn't match"
+        # Test clockwise rotation
+        assert len(clockwise_result.content) == 1
+        clockwise_bytes = pybase64.b64decode(clockwise_result.content[0].data, validate=True)
+        server_clockwise_image = mcp_image_to_pil_image(clockwise_bytes)
+        
+        # Create the same rotation locally with PIL (transpose is an exact pixel permutation, no resampling)
+        local_clockwise_image = original_image.transpose(PILImage.Transpose.ROTATE_270)
+        
+        # Test counterclockwise rotation
+        assert len(counterclockwise_result.content) == 1
+        counterclockwise_bytes = pybase64.b64decode(counterclockwise_result.content[0].data, validate=True)
+        server_counterclockwise_image = mcp_image_to_pil_image(counterclockwise_bytes)
+        
+        # Create the same rotation locally with PIL
+        local_counterclockwise_image = original_image.transpose(PILImage.Transpose.ROTATE_90)
+        
+        # Verify dimensions match
+        assert server_clockwise_image.size == local_clockwise_image.size
+        assert server_counterclockwise_image.size == local_counterclockwise_image.size
+        
+        # Verify the server-rotated images match the locally-rotated images
+        assert images_equal(server_clockwise_image, local_clockwise_image), "Clockwise rotation doesn't match"
+        assert images_equal(server_counterclockwise_image, local_counterclockwise_image), "Counterclockwise rotation doesn't match"
     
-    @pytest.mark.asyncio
-    async def test_zoom_in(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.parametrize(
+        "mode, suffix",
+        [
+            ("CMYK", ".jpg"),  # CMYK JPEG
+            ("F", ".tif"),  # 32-bit float TIFF
+            ("I;16B", ".tif"),  # 16-bit big-endian TIFF
+        ],
+        ids=["cmyk_jpeg", "float_tiff", "uint16_big_endian_tiff"],
+    )
+    async def test_rotate_non_rgb_image(self, mcp_session, tmp_path, mode, suffix):
         '''
-        Verifies that the crop_and_zoom tool works correctly with a zoom factor greater 
-        than 1.0 (zooming in) by comparing server-processed image with locally 
-        processed image using PIL
+        Verifies that rotate_image handles images in modes PNG can't store, returning them
+        with their mode and pixels intact
         '''
-        # Define crop coordinates (normalized 0-1)
-        x_min, y_min, x_max, y_max = 0.3, 0.3, 0.7, 0.7
-        zoom_factor = 2.0  # Enlarge the image by 2x
+        # A quarter-size copy keeps the payload small, these modes are sent uncompressed
+        path = tmp_path / f"demo{suffix}"
+        original_image.reduce(4).convert(mode).save(path)
         
-        async with self.get_session() as session:
-            # Call the crop_and_zoom tool with zoom factor > 1.0
-            zoom_result = await session.call_tool(
-                "crop_and_zoom",
-                arguments={
-                    "image_path": self.image_path,
-                    "x_min": x_min,
-                    "y_min": y_min,
-                    "x_max": x_max,
-                    "y_max": y_max,
-                    "zoom_factor": zoom_factor
-                }
-            )
-            
-            # Process the result
-            assert len(zoom_result.content) == 1
-            zoom_bytes = base64.b64decode(zoom_result.content[0].data)
-            server_zoomed_image = mcp_image_to_pil_image(zoom_bytes)
-            
-            # Create the same crop and zoom locally with PIL
-            width, height = self.original_image.size
-            left = int(x_min * width)
-            top = int(y_min * height)
-            right = int(x_max * width)
-            bottom = int(y_max * height)
-            
-            # First crop the image
-            local_cropped_image = self.original_image.crop((left, top, right, bottom))
-            
-            # Then resize it according to zoom factor using the same resampling method
-            local_zoomed_image = local_cropped_image.resize(
-                (int(local_cropped_image.width * zoom_factor), 
-                 int(local_cropped_image.height * zoom_factor)),
-                PILImage.Resampling.LANCZOS
-            )
-            
-            # Convert images to numpy arrays for comparison
-            server_zoom_array = np.array(server_zoomed_image)
-            local_zoom_array = np.array(local_zoomed_image)
-            
-            # Verify dimensions match
-            assert server_zoom_array.shape == local_zoom_array.shape, "Zoomed image dimensions don't match"
-            
-            # Verify the image content matches
-            assert np.array_equal(server_zoom_array, local_zoom_array), "Zoomed image content doesn't match"
+        # Reopen the saved file so the reference starts from the same decoded pixels as the server (JPEG is lossy)
+        with PILImage.open(path) as img:
+            local_image = img.transpose(PILImage.Transpose.ROTATE_270)
+        
+        session = mcp_session
+        result = await session.call_tool(
+            "rotate_image",
+            arguments={"image_path": str(path), "direction": "clockwise"}
+        )
+        
+        assert len(result.content) == 1
+        server_image = mcp_image_to_pil_image(pybase64.b64decode(result.content[0].data, validate=True))
+        
+        assert server_image.mode == mode
+        assert images_equal(server_image, local_image), "Rotation doesn't match"
     
-    @pytest.mark.asyncio
-    async def test_zoom_out(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.parametrize(
+        "coords, zoom_factor",
+        [
+            ((0.25, 0.25, 0.75, 0.75), 1.0),  # Basic crop with the default zoom factor
+            ((0.3, 0.3, 0.7, 0.7), 2.0),  # Zoom in: enlarge the crop by 2x
+            ((0.1, 0.1, 0.9, 0.9), 0.5),  # Zoom out: reduce the crop by half
+            ((0.0, 0.0, 1.0, 1.0), 1.0),  # Full image
+            ((0.45, 0.45, 0.55, 0.55), 1.0),  # Just 10% of the image in the center
+        ],
+        ids=["basic_crop", "zoom_in", "zoom_out", "full_image_crop", "small_region_crop"],
+    )
+    async def test_crop_and_zoom(self, mcp_session, coords, zoom_factor):
         '''
-        Verifies that the crop_and_zoom tool works correctly with a zoom factor less
-        than 1.0 (zooming out) by comparing server-processed image with locally 
-        processed image using PIL
+        Verifies that the crop_and_zoom tool works correctly for a range of crop boxes and
+        zoom factors by comparing the server-processed image with a locally processed
+        image using PIL
         '''
-        # Define crop coordinates (normalized 0-1)
-        x_min, y_min, x_max, y_max = 0.1, 0.1, 0.9, 0.9
-        zoom_factor = 0.5  # Reduce the image size by half
+        # Crop coordinates (normalized 0-1)
+        x_min, y_min, x_max, y_max = coords
         
-        async with self.get_session() as session:
-            # Call the crop_and_zoom tool with zoom factor < 1.0
-            zoom_result = await session.call_tool(
+        session = mcp_session
+        # Call the crop_and_zoom tool, meanwhile create the same crop and zoom locally in a worker thread
+        crop_result, local_image = await asyncio.gather(
+            session.call_tool(
                 "crop_and_zoom",
                 arguments={
-                    "image_path": self.image_path,
+                    "image_path": image_path,
                     "x_min": x_min,
                     "y_min": y_min,
                     "x_max": x_max,
                     "y_max": y_max,
                     "zoom_factor": zoom_factor
                 }
-            )
-            
-            # Process the result
-            assert len(zoom_result.content) == 1
-            zoom_bytes = base64.b64decode(zoom_result.content[0].data)
-            server_zoomed_image = mcp_image_to_pil_image(zoom_bytes)
-            
-            # Create the same crop and zoom locally with PIL
-            width, height = self.original_image.size
-            left = int(x_min * width)
-            top = int(y_min * height)
-            right = int(x_max * width)
-            bottom = int(y_max * height)
-            
-            # First crop the image
-            local_cropped_image = self.original_image.crop((left, top, right, bottom))
-            
-            # Then resize it according to zoom factor using the same resampling method
-            local_zoomed_image = local_cropped_image.resize(
-                (int(local_cropped_image.width * zoom_factor), 
-                 int(local_cropped_image.height * zoom_factor)),
-                PILImage.Resampling.LANCZOS
-            )
-            
-            # Convert images to numpy arrays for comparison
-            server_zoom_array = np.array(server_zoomed_image)
-            local_zoom_array = np.array(local_zoomed_image)
-            
-            # Verify dimensions match
-            assert server_zoom_array.shape == local_zoom_array.shape, "Zoomed out image dimensions don't match"
-            
-            # Verify the image content matches
-            assert np.array_equal(server_zoom_array, local_zoom_array), "Zoomed out image content doesn't match"
-    
-    @pytest.mark.asyncio
-    async def test_full_image_crop(self):
-        '''
-        Verifies that the crop_and_zoom tool works correctly when cropping the entire image
-        (using coordinates 0,0,1,1) by comparing the result with the original image
-        '''
-        # Define coordinates to crop the entire image (normalized 0-1)
-        x_min, y_min, x_max, y_max = 0.0, 0.0, 1.0, 1.0
+            ),
+            asyncio.to_thread(local_crop_and_zoom, x_min, y_min, x_max, y_max, zoom_factor),
+        )
         
-        async with self.get_session() as session:
-            # Call the crop_and_zoom tool with coordinates for full image
-            crop_result = await session.call_tool(
-                "crop_and_zoom",
-                arguments={
-                    "image_path": self.image_path,
-                    "x_min": x_min,
-                    "y_min": y_min,
-                    "x_max": x_max,
-                    "y_max": y_max
-                }
-            )
-            
-            # Process the result
-            assert len(crop_result.content) == 1
-            crop_bytes = base64.b64decode(crop_result.content[0].data)
-            server_cropped_image = mcp_image_to_pil_image(crop_bytes)
-            
-            # Create the same crop locally with PIL
-            width, height = self.original_image.size
-            left = int(x_min * width)
-            top = int(y_min * height)
-            right = int(x_max * width)
-            bottom = int(y_max * height)
-            local_cropped_image = self.original_image.crop((left, top, right, bottom))
-            
-            # Convert images to numpy arrays for comparison
-            server_crop_array = np.array(server_cropped_image)
-            local_crop_array = np.array(local_cropped_image)
-            original_array = np.array(self.original_image)
-            
-            # Verify dimensions match the original image
-            assert server_crop_array.shape == original_array.shape, "Full image crop dimensions don't match original"
-            assert local_crop_array.shape == original_array.shape, "Local full image crop dimensions don't match original"
-            
-            # Verify the server-cropped image matches the original image
-            assert np.array_equal(server_crop_array, original_array), "Full image crop doesn't match original image"
-            
-            # Verify the server-cropped image matches the locally-cropped image
-            assert np.array_equal(server_crop_array, local_crop_array), "Full image crop doesn't match local crop"
-    
-    @pytest.mark.asyncio
-    async def test_small_region_crop(self):
-        '''
-        Verifies that the crop_and_zoom tool works correctly when cropping a very small
-        region of the image by comparing server-processed image with locally processed
-        image using PIL
-        '''
-        # Define coordinates to crop a very small region (normalized 0-1)
-        x_min, y_min, x_max, y_max = 0.45, 0.45, 0.55, 0.55  # Just 10% of the image in the center
+        # Process the result
+        assert len(crop_result.content) == 1
+        crop_bytes = pybase64.b64decode(crop_result.content[0].data, validate=True)
+        server_image = mcp_image_to_pil_image(crop_bytes)
         
-        async with self.get_session() as session:
-            # Call the crop_and_zoom tool with coordinates for a small region
-            crop_result = await session.call_tool(
-                "crop_and_zoom",
-                arguments={
-                    "image_path": self.image_path,
-                    "x_min": x_min,
-                    "y_min": y_min,
-                    "x_max": x_max,
-                    "y_max": y_max
-                }
-            )
-            
-            # Process the result
-            assert len(crop_result.content) == 1
-            crop_bytes = base64.b64decode(crop_result.content[0].data)
-            server_cropped_image = mcp_image_to_pil_image(crop_bytes)
-            
-            # Create the same crop locally with PIL
-            width, height = self.original_image.size
-            left = int(x_min * width)
-            top = int(y_min * height)
-            right = min(int(x_max * width), width)
-            bottom = min(int(y_max * height), height)
-            local_cropped_image = self.original_image.crop((left, top, right, bottom))
-            
-            # Convert images to numpy arrays for comparison
-            server_crop_array = np.array(server_cropped_image)
-            local_crop_array = np.array(local_cropped_image)
-            
-            # Verify dimensions match
-            assert server_crop_array.shape == local_crop_array.shape, "Small region crop dimensions don't match"
-            
-            # Verify the server-cropped image matches the locally-cropped image
-            assert np.array_equal(server_crop_array, local_crop_array), "Small region crop content doesn't match"
-            
-            # Additional check: verify the dimensions of the result are exactly as expected
-            # Calculate expected dimensions using same algorithm as the server
-            expected_width = right - left
-            expected_height = bottom - top
-            
-            # The cropped dimensions should match our calculations exactly
-            assert server_cropped_image.width == expected_width, f"Small region crop width incorrect: got {server_cropped_image.width}, expected {expected_width}"
-            assert server_cropped_image.height == expected_height, f"Small region crop height incorrect: got {server_cropped_image.height}, expected {expected_height}"
+        # Calculate expected dimensions using same algorithm as the server
+        width, height = original_image.size
+        left = int(x_min * width)
+        top = int(y_min * height)
+        right = min(int(x_max * width), width)
+        bottom = min(int(y_max * height), height)
+        expected_size = (int((right - left) * zoom_factor), int((bottom - top) * zoom_factor))
+        
+        # The output dimensions should match our calculations exactly
+        assert server_image.size == expected_size, f"Crop dimensions incorrect: got {server_image.size}, expected {expected_size}"
+        
+        # Verify the server-processed image matches the locally-processed image
+        assert images_equal(server_image, local_image), "Crop and zoom content doesn't match"
+        
+        # Without zoom the result must be exactly the pixels inside the box (the whole original for the full image)
+        if zoom_factor == 1.0:
+            assert images_equal(server_image, original_image.crop((left, top, right, bottom))), "Crop doesn't match the original pixels"
     
-    @pytest.mark.asyncio
-    async def test_invalid_coordinates(self):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_invalid_coordinates(self, mcp_session):
         '''
         Verifies that the crop_and_zoom tool correctly handles invalid coordinates
         by returning appropriate error responses
         '''
-        async with self.get_session() as session:
+        session = mcp_session
+        cases = [
             # Test case 1: x_min > x_max
-            response = await session.call_tool(
-                "crop_and_zoom",
-                arguments={
-                    "image_path": self.image_path,
-                    "x_min": 0.8,
-                    "y_min": 0.2,
-                    "x_max": 0.3,  # Less than x_min
-                    "y_max": 0.7
-                }
-            )
-            assert len(response.content) == 1
-            response_content = response.content[0]
-            # Verify response has error information
-            assert "Invalid bounding box coordinates" in response_content.text
-            
+            {"x_min": 0.8, "y_min": 0.2, "x_max": 0.3, "y_max": 0.7},
             # Test case 2: y_min > y_max
-            response = await session.call_tool(
-                "crop_and_zoom",
-                arguments={
-                    "image_path": self.image_path,
-                    "x_min": 0.2,
-                    "y_min": 0.8,
-                    "x_max": 0.7,
-                    "y_max": 0.3  # Less than y_min
-                }
-            )
-            assert len(response.content) == 1
-            response_content = response.content[0]
-            # Verify response has error information
-            assert "Invalid bounding box coordinates" in response_content.text
-            
+            {"x_min": 0.2, "y_min": 0.8, "x_max": 0.7, "y_max": 0.3},
             # Test case 3: Coordinates outside the 0-1 range (negative)
-            response = await session.call_tool(
-                "crop_and_zoom",
-                arguments={
-                    "image_path": self.image_path,
-                    "x_min": -0.2,  # Negative value
-                    "y_min": 0.2,
-                    "x_max": 0.7,
-                    "y_max": 0.8
-                }
-            )
-            assert len(response.content) == 1
-            response_content = response.content[0]
-            # Verify response has error information
-            assert "Invalid bounding box coordinates" in response_content.text
-            
+            {"x_min": -0.2, "y_min": 0.2, "x_max": 0.7, "y_max": 0.8},
             # Test case 4: Coordinates outside the 0-1 range (greater than 1)
-            response = await session.call_tool(
-                "crop_and_zoom",
-                arguments={
-                    "image_path": self.image_path,
-                    "x_min": 0.2,
-                    "y_min": 0.2,
-                    "x_max": 1.2,  # Greater than 1
-                    "y_max": 0.8
-                }
-            )
+            {"x_min": 0.2, "y_min": 0.2, "x_max": 1.2, "y_max": 0.8},
+        ]
+        
+        # The error cases are independent, so send them all at once
+        responses = await asyncio.gather(*(
+            session.call_tool("crop_and_zoom", arguments={"image_path": image_path, **case})
+            for case in cases
+        ))
+        
+        for case, response in zip(cases, responses):
             assert len(response.content) == 1
             response_content = response.content[0]
             # Verify response has error information
-            assert "Invalid bounding box coordinates" in response_content.text
-    
-    
-    
-
-            
+            assert "Invalid bounding box coordinates" in response_content.text, f"No error for {case}"